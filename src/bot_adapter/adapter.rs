@@ -1,17 +1,25 @@
 use futures_util::StreamExt;
 use log::{debug, error, info, warn};
-use tokio_tungstenite::{connect_async, tungstenite::Message as WsMessage};
+use serde::Deserialize;
+use tokio::net::TcpStream;
+use tokio_tungstenite::{
+    connect_async_with_config,
+    tungstenite::{handshake::client::generate_key, Message as WsMessage},
+    MaybeTlsStream, WebSocketStream,
+};
 
 use super::event;
 use super::models::{MessageEvent, MessageType, Profile, RawMessageEvent};
 use crate::util::url_utils::extract_host;
 use crate::error::Result;
+use std::borrow::Cow;
 use std::sync::Arc;
-use tokio::sync::Mutex as TokioMutex;
+use std::time::{Duration, Instant};
+use tokio::sync::{mpsc, Mutex as TokioMutex};
 
 /// Trait for brain agents that handle event processing
 pub trait BrainAgentTrait: Send + Sync {
-    fn on_event(&self, bot_adapter: &mut BotAdapter, event: &super::models::MessageEvent) -> Result<()>;
+    fn on_event(&self, bot_adapter: &mut BotAdapter, event: &MessageEvent) -> Result<()>;
     fn name(&self) -> &'static str;
     fn clone_box(&self) -> AgentBox;
 }
@@ -24,6 +32,45 @@ impl Clone for AgentBox {
     }
 }
 
+type WsStream = WebSocketStream<MaybeTlsStream<TcpStream>>;
+
+/// Delay before the first reconnect attempt after a connection drops
+const INITIAL_RECONNECT_BACKOFF: Duration = Duration::from_secs(1);
+
+/// Upper bound on the delay between reconnect attempts
+const MAX_RECONNECT_BACKOFF: Duration = Duration::from_secs(30);
+
+/// Uptime after which a connection counts as healthy even if it delivered no frames
+const MIN_STABLE_CONNECTION: Duration = Duration::from_secs(30);
+
+/// Number of frames (and decoded events) that may wait in each queue before the
+/// upstream stage pauses
+const FRAME_QUEUE_CAPACITY: usize = 1024;
+
+/// Upper bound on queued frames taken by the decoder in one go
+const MAX_EVENT_BATCH: usize = 64;
+
+/// Why a received frame did not produce a message event
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+enum DecodeSkip {
+    /// Not valid JSON at all
+    InvalidJson,
+    /// A meta event, notice or request without `message_type`
+    NonMessage,
+    /// A message event whose `message_type` this adapter does not handle
+    UnsupportedType,
+    /// A supported message event whose body failed to decode
+    MalformedEvent,
+}
+
+/// Top-level fields of an inbound event, used to classify a frame that failed full decoding
+#[derive(Deserialize)]
+struct EventHeader<'a> {
+    /// Empty when the frame is not a message event (meta events, notices, ...)
+    #[serde(borrow, default)]
+    message_type: Cow<'a, str>,
+}
+
 /// Configuration for BotAdapter initialization
 pub struct BotAdapterConfig {
     pub url: String,
@@ -57,8 +104,10 @@ pub struct BotAdapter {
     url: String,
     token: String,
     bot_profile: Option<Profile>,
-    brain_agent: Option<AgentBox>,
-    event_handlers: Vec<event::EventHandler>,
+    /// Bound once so each dispatched event shares the agent instead of cloning it
+    brain_agent: Option<Arc<dyn BrainAgentTrait>>,
+    /// Shared so each dispatched event takes a refcount instead of copying the list
+    event_handlers: Arc<Vec<event::EventHandler>>,
 }
 
 /// Shared handle for BotAdapter that allows mutation inside async tasks
@@ -73,8 +122,8 @@ impl BotAdapter {
                 qq_id: config.qq_id,
                 ..Default::default()
             }),
-            brain_agent: config.brain_agent,
-            event_handlers: Vec::new(),
+            brain_agent: config.brain_agent.map(Arc::from),
+            event_handlers: Arc::new(Vec::new()),
         }
     }
 
@@ -95,126 +144,264 @@ impl BotAdapter {
         self.bot_profile.as_ref()
     }
 
-    pub fn get_brain_agent(&self) -> Option<&AgentBox> {
+    pub fn get_brain_agent(&self) -> Option<&Arc<dyn BrainAgentTrait>> {
         self.brain_agent.as_ref()
     }
 
+    /// Register a handler for incoming message events
+    ///
+    /// Handlers must be registered before [`BotAdapter::start`]; the dispatcher takes a
+    /// snapshot of them when it starts.
     pub fn register_event_handler(&mut self, handler: event::EventHandler) {
-        self.event_handlers.push(handler);
+        Arc::make_mut(&mut self.event_handlers).push(handler);
     }
 
-    pub fn get_event_handlers(&self) -> Vec<event::EventHandler> {
-        self.event_handlers.clone()
+    pub fn get_event_handlers(&self) -> Arc<Vec<event::EventHandler>> {
+        Arc::clone(&self.event_handlers)
     }
 
     /// Start the WebSocket connection and begin processing events using a shared handle
+    ///
+    /// The first connection attempt fails fast so configuration errors reach the caller.
+    /// Once connected, dropped connections are re-established with exponential backoff
+    /// on the same runtime instead of returning.
     pub async fn start(
         adapter: SharedBotAdapter,
     ) -> Result<()> {
-        let (url, token) = {
+        let (url, token, handlers, brain_agent) = {
             let guard = adapter.lock().await;
-            (guard.url.clone(), guard.token.clone())
+            (
+                guard.url.clone(),
+                guard.token.clone(),
+                guard.get_event_handlers(),
+                guard.get_brain_agent().cloned(),
+            )
         };
 
         info!("Connecting to bot server at {}", url);
+        let mut ws_stream = BotAdapter::connect(&url, &token).await?;
+
+        // Frames are decoded on a separate task so the socket read loop never waits on
+        // parsing, and a single dispatcher task hands events to the handlers in arrival
+        // order. The bounded queues apply backpressure when either falls behind, and both
+        // tasks outlive individual connections.
+        let (frame_tx, frame_rx) = mpsc::channel(FRAME_QUEUE_CAPACITY);
+        let (event_tx, event_rx) = mpsc::channel(FRAME_QUEUE_CAPACITY);
+        tokio::spawn(BotAdapter::decode_frames(frame_rx, event_tx));
+        let dispatch_task = tokio::spawn(BotAdapter::dispatch_events(
+            adapter.clone(),
+            event_rx,
+            handlers,
+            brain_agent,
+        ));
+
+        let mut backoff = INITIAL_RECONNECT_BACKOFF;
+        loop {
+            let connected_at = Instant::now();
+            let delivered = BotAdapter::receive_frames(&frame_tx, ws_stream).await;
+            if frame_tx.is_closed() {
+                // The decoder also stops once the dispatcher is gone, so check that first
+                let stage = if dispatch_task.is_finished() { "dispatcher" } else { "decoder" };
+                return Err(format!("Event {} stopped unexpectedly", stage).into());
+            }
+
+            // Only a connection that actually worked earns a fresh backoff, so a server
+            // that accepts the handshake and closes right away keeps backing off
+            if delivered || connected_at.elapsed() >= MIN_STABLE_CONNECTION {
+                backoff = INITIAL_RECONNECT_BACKOFF;
+            }
+
+            ws_stream = loop {
+                warn!("Reconnecting to bot server in {:?}", backoff);
+                tokio::time::sleep(backoff).await;
+                let result = BotAdapter::connect(&url, &token).await;
+                backoff = (backoff * 2).min(MAX_RECONNECT_BACKOFF);
+                match result {
+                    Ok(stream) => break stream,
+                    Err(e) => error!("Failed to reconnect to bot server: {}", e),
+                }
+            };
+        }
+    }
 
+    /// Open an authorized WebSocket connection to the bot server
+    async fn connect(url: &str, token: &str) -> Result<WsStream> {
         // Build the WebSocket request with authorization header
         let request = http::Request::builder()
-            .uri(&url)
+            .uri(url)
             .header("Authorization", format!("Bearer {}", token))
-            .header("Host", extract_host(&url).unwrap_or("localhost"))
+            .header("Host", extract_host(url).unwrap_or("localhost"))
             .header("Connection", "Upgrade")
             .header("Upgrade", "websocket")
             .header("Sec-WebSocket-Version", "13")
-            .header(
-                "Sec-WebSocket-Key",
-                tokio_tungstenite::tungstenite::handshake::client::generate_key(),
-            )
+            .header("Sec-WebSocket-Key", generate_key())
             .body(())?;
 
-        let (ws_stream, _) = connect_async(request).await?;
+        // The only frames this client writes are the automatic pong/close replies;
+        // disabling Nagle sends those immediately instead of waiting to coalesce them.
+        // It has no effect on inbound frames. Size limits stay at tungstenite's defaults.
+        let (ws_stream, _) = connect_async_with_config(request, None, true).await?;
         info!("Connected to the qq bot server successfully.");
+        Ok(ws_stream)
+    }
 
+    /// Read frames from an established connection until it is closed or fails,
+    /// queueing their payloads for the decoder task
+    ///
+    /// Returns whether at least one data frame was delivered to the decoder.
+    async fn receive_frames(frame_tx: &mpsc::Sender<Vec<u8>>, ws_stream: WsStream) -> bool {
         let (mut _write, mut read) = ws_stream.split();
+        let mut delivered = false;
 
-        // Process incoming messages
         while let Some(msg_result) = read.next().await {
-            match msg_result {
-                Ok(WsMessage::Text(text)) => {
-                    let adapter_clone = adapter.clone();
-                    BotAdapter::process_event(adapter_clone, text).await;
-                }
-                Ok(WsMessage::Binary(data)) => {
-                    if let Ok(text) = String::from_utf8(data) {
-                        let adapter_clone = adapter.clone();
-                        BotAdapter::process_event(adapter_clone, text).await;
-                    } else {
-                        warn!("Received binary message that is not valid UTF-8");
-                    }
-                }
+            let frame = match msg_result {
+                Ok(WsMessage::Text(text)) => text.into_bytes(),
+                // serde_json validates UTF-8 while parsing, no separate decode pass needed
+                Ok(WsMessage::Binary(data)) => data,
                 Ok(WsMessage::Close(_)) => {
                     info!("WebSocket connection closed");
                     break;
                 }
                 Ok(WsMessage::Ping(_)) | Ok(WsMessage::Pong(_)) => {
                     // Heartbeat messages, ignore
+                    continue;
                 }
                 Ok(WsMessage::Frame(_)) => {
                     // Raw frame, ignore
+                    continue;
                 }
                 Err(e) => {
                     error!("WebSocket error: {}", e);
                     break;
                 }
+            };
+
+            if frame_tx.send(frame).await.is_err() {
+                error!("Event decoder stopped, dropping connection");
+                break;
             }
+            delivered = true;
         }
 
-        Ok(())
+        delivered
     }
 
-    /// Process a single event message
-    async fn process_event(adapter: SharedBotAdapter, message: String) {
-        debug!("Received message: {}", message);
+    /// Decode queued frames and forward the resulting events to the dispatcher task
+    async fn decode_frames(
+        mut frame_rx: mpsc::Receiver<Vec<u8>>,
+        event_tx: mpsc::Sender<MessageEvent>,
+    ) {
+        let mut frames = Vec::with_capacity(MAX_EVENT_BATCH);
+        while frame_rx.recv_many(&mut frames, MAX_EVENT_BATCH).await > 0 {
+            for frame in frames.drain(..) {
+                let Ok(event) = BotAdapter::decode_event(&frame) else {
+                    continue;
+                };
+                if event_tx.send(event).await.is_err() {
+                    error!("Event dispatcher stopped, no longer decoding frames");
+                    return;
+                }
+            }
+        }
+    }
+
+    /// Decode a single event message
+    ///
+    /// Frames that do not yield a message event are logged and reported as a [`DecodeSkip`].
+    fn decode_event(message: &[u8]) -> std::result::Result<MessageEvent, DecodeSkip> {
+        debug!("Received message: {}", String::from_utf8_lossy(message));
 
-        // Parse the JSON message
-        let message_json: serde_json::Value = match serde_json::from_str(&message) {
-            Ok(v) => v,
+        // Message events are the hot path, so decode them in a single pass and only
+        // peek at the header when that fails, to tell skipped frames from broken ones
+        let decode_err = match serde_json::from_slice::<RawMessageEvent>(message) {
+            Ok(raw_event) => return Ok(MessageEvent::from(raw_event)),
+            Err(e) => e,
+        };
+
+        let header: EventHeader = match serde_json::from_slice(message) {
+            Ok(h) => h,
             Err(e) => {
                 error!("Failed to parse message as JSON: {}", e);
-                return;
+                return Err(DecodeSkip::InvalidJson);
             }
         };
 
-        // Check if this is a message event (has message_type field)
-        if message_json.get("message_type").is_none() {
-            debug!("Ignoring non-message event");
-            return;
+        match header.message_type.as_ref() {
+            "" => {
+                debug!("Ignoring non-message event");
+                Err(DecodeSkip::NonMessage)
+            }
+            raw => match MessageType::from_raw(raw) {
+                Some(_) => {
+                    error!("Failed to parse message event: {}", decode_err);
+                    Err(DecodeSkip::MalformedEvent)
+                }
+                None => {
+                    debug!("Ignoring unsupported message type: {}", raw);
+                    Err(DecodeSkip::UnsupportedType)
+                }
+            },
         }
+    }
 
-        // Parse as RawMessageEvent
-        let raw_event: RawMessageEvent = match serde_json::from_value(message_json) {
-            Ok(e) => e,
-            Err(e) => {
-                error!("Failed to parse message event: {}", e);
-                return;
+    /// Hand events to the unified message handler one at a time, in arrival order
+    ///
+    /// Each event runs in its own task that is awaited before the next one starts, so a
+    /// panicking handler only loses that event. Handlers should return quickly: a slow one
+    /// holds up later events and, once both queues fill, reading from the socket.
+    async fn dispatch_events(
+        adapter: SharedBotAdapter,
+        mut event_rx: mpsc::Receiver<MessageEvent>,
+        handlers: Arc<Vec<event::EventHandler>>,
+        brain_agent: Option<Arc<dyn BrainAgentTrait>>,
+    ) {
+        while let Some(event) = event_rx.recv().await {
+            let task = tokio::spawn(event::process_message(
+                adapter.clone(),
+                event,
+                Arc::clone(&handlers),
+                brain_agent.clone(),
+            ));
+            if let Err(e) = task.await {
+                error!("Message handler failed: {}", e);
             }
-        };
+        }
+    }
+}
 
-        // Create the MessageEvent (messages are already deserialized in RawMessageEvent)
-        let event = MessageEvent {
-            message_id: raw_event.message_id,
-            message_type: raw_event.message_type,
-            sender: raw_event.sender.clone(),
-            message_list: raw_event.message.clone(),
-            group_id: raw_event.group_id,
-            group_name: raw_event.group_name.clone(),
-            is_group_message: matches!(raw_event.message_type, MessageType::Group),
-        };
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_decode_event_message() {
+        let frame = br#"{"post_type":"message","message_id":1,"message_type":"private","sender":{"user_id":42,"nickname":"alice"},"message":[{"type":"text","data":{"text":"hi"}}]}"#;
+        let event = BotAdapter::decode_event(frame).expect("message event should decode");
+        assert_eq!(event.message_id, 1);
+        assert!(!event.is_group_message);
+        assert_eq!(event.message_list.len(), 1);
+    }
+
+    #[test]
+    fn test_decode_event_skips_non_message_event() {
+        let frame = br#"{"post_type":"meta_event","meta_event_type":"heartbeat"}"#;
+        assert_eq!(BotAdapter::decode_event(frame).unwrap_err(), DecodeSkip::NonMessage);
+    }
+
+    #[test]
+    fn test_decode_event_skips_unsupported_message_type() {
+        let frame = br#"{"post_type":"message","message_id":1,"message_type":"guild","sender":{"user_id":42,"nickname":"alice"}}"#;
+        assert_eq!(BotAdapter::decode_event(frame).unwrap_err(), DecodeSkip::UnsupportedType);
+    }
+
+    #[test]
+    fn test_decode_event_rejects_invalid_json() {
+        assert_eq!(BotAdapter::decode_event(b"not json").unwrap_err(), DecodeSkip::InvalidJson);
+    }
 
-        // Dispatch to the unified message handler
-        let adapter_clone = adapter.clone();
-        tokio::spawn(async move {
-            event::process_message(adapter_clone, event).await;
-        });
+    #[test]
+    fn test_decode_event_rejects_malformed_message_event() {
+        let frame = br#"{"post_type":"message","message_id":"x","message_type":"private","sender":{"user_id":42,"nickname":"alice"}}"#;
+        assert_eq!(BotAdapter::decode_event(frame).unwrap_err(), DecodeSkip::MalformedEvent);
     }
 }
@@ -1,53 +1,53 @@
-use log::{info, error};
+use log::{error, info, log_enabled, Level};
 use std::sync::Arc;
 use std::future::Future;
 use std::pin::Pin;
 
 use super::models::{MessageEvent, MessageType};
-use crate::bot_adapter::adapter::SharedBotAdapter;
+use crate::bot_adapter::adapter::{BrainAgentTrait, SharedBotAdapter};
 
 /// Process messages (both private and group)
-pub async fn process_message(bot_adapter: SharedBotAdapter, event: MessageEvent) {
-    let messages: Vec<String> = event.message_list.iter()
-        .map(|m| m.to_string())
-        .collect();
-    
-    // Log based on message type
-    match event.message_type {
-        MessageType::Private => {
-            info!(
-                "[Friend Message] [Sender: {}({})] Message: {:?}",
-                event.sender.nickname,
-                event.sender.user_id,
-                messages
-            );
-        }
-        MessageType::Group => {
-            info!(
-                "[Group Message] [Group: {}({})] [Sender: {}({})] Message: {:?}",
-                event.group_name.as_deref().unwrap_or_default(),
-                event.group_id.unwrap_or_default(),
-                event.sender.nickname,
-                event.sender.user_id,
-                messages
-            );
+///
+/// `handlers` and `brain_agent` are passed in by the caller so dispatch never waits on
+/// the adapter lock, which a running brain agent holds for its whole inference.
+pub async fn process_message(
+    bot_adapter: SharedBotAdapter,
+    event: MessageEvent,
+    handlers: Arc<Vec<EventHandler>>,
+    brain_agent: Option<Arc<dyn BrainAgentTrait>>,
+) {
+    // Formatting every segment is only worth doing when the line is actually emitted
+    if log_enabled!(Level::Info) {
+        let messages: Vec<String> = event.message_list.iter()
+            .map(|m| m.to_string())
+            .collect();
+
+        match event.message_type {
+            MessageType::Private => {
+                info!(
+                    "[Friend Message] [Sender: {}({})] Message: {:?}",
+                    event.sender.nickname,
+                    event.sender.user_id,
+                    messages
+                );
+            }
+            MessageType::Group => {
+                info!(
+                    "[Group Message] [Group: {}({})] [Sender: {}({})] Message: {:?}",
+                    event.group_name.as_deref().unwrap_or_default(),
+                    event.group_id.unwrap_or_default(),
+                    event.sender.nickname,
+                    event.sender.user_id,
+                    messages
+                );
+            }
         }
     }
 
-    let handlers = {
-        let bot_adapter_guard = bot_adapter.lock().await;
-        bot_adapter_guard.get_event_handlers()
-    };
-
-    for handler in handlers {
+    for handler in handlers.iter() {
         (handler)(&event).await;
     }
 
-    let brain_agent = {
-        let bot_adapter_guard = bot_adapter.lock().await;
-        bot_adapter_guard.get_brain_agent().cloned()
-    };
-
     if let Some(brain) = brain_agent {
         let bot_adapter_clone = bot_adapter.clone();
         tokio::spawn(async move {
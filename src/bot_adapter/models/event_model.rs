@@ -2,7 +2,8 @@ use serde::{Deserialize, Serialize};
 use std::fmt;
 
 use log::warn;
-use serde::de::Deserializer;
+use serde::de::{Deserializer, SeqAccess, Visitor};
+use serde_json::value::RawValue;
 
 use super::message::Message;
 
@@ -16,18 +17,29 @@ pub enum MessageType {
 
 impl fmt::Display for MessageType {
     fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
-        match self {
-            MessageType::Private => write!(f, "private"),
-            MessageType::Group => write!(f, "group"),
-        }
+        f.write_str(self.as_str())
     }
 }
 
 impl MessageType {
+    /// Raw `message_type` value of a private chat event
+    pub const PRIVATE: &'static str = "private";
+    /// Raw `message_type` value of a group chat event
+    pub const GROUP: &'static str = "group";
+
     pub fn as_str(&self) -> &'static str {
         match self {
-            MessageType::Private => "private",
-            MessageType::Group => "group",
+            MessageType::Private => Self::PRIVATE,
+            MessageType::Group => Self::GROUP,
+        }
+    }
+
+    /// Map a raw `message_type` value to a supported type, `None` if unsupported
+    pub fn from_raw(raw: &str) -> Option<Self> {
+        match raw {
+            Self::PRIVATE => Some(MessageType::Private),
+            Self::GROUP => Some(MessageType::Group),
+            _ => None,
         }
     }
 }
@@ -70,21 +82,127 @@ pub struct RawMessageEvent {
     pub group_name: Option<String>,
 }
 
+impl From<RawMessageEvent> for MessageEvent {
+    /// Moves the already-deserialized fields over without copying them
+    fn from(raw: RawMessageEvent) -> Self {
+        MessageEvent {
+            message_id: raw.message_id,
+            message_type: raw.message_type,
+            sender: raw.sender,
+            message_list: raw.message,
+            group_id: raw.group_id,
+            group_name: raw.group_name,
+            is_group_message: matches!(raw.message_type, MessageType::Group),
+        }
+    }
+}
+
 fn deserialize_message_vec_lenient<'de, D>(deserializer: D) -> Result<Vec<Message>, D::Error>
 where
     D: Deserializer<'de>,
 {
-    let raw_values = Vec::<serde_json::Value>::deserialize(deserializer)?;
-
-    let mut out = Vec::with_capacity(raw_values.len());
-    for v in raw_values {
-        match serde_json::from_value::<Message>(v) {
-            Ok(m) => out.push(m),
-            Err(e) => {
-                // Do not fail the whole event when a single element is unsupported.
-                warn!("Skipping unsupported message element: {}", e);
+    struct LenientMessageVec;
+
+    impl<'de> Visitor<'de> for LenientMessageVec {
+        type Value = Vec<Message>;
+
+        fn expecting(&self, f: &mut fmt::Formatter) -> fmt::Result {
+            f.write_str("a list of message elements")
+        }
+
+        fn visit_seq<A>(self, mut seq: A) -> Result<Vec<Message>, A::Error>
+        where
+            A: SeqAccess<'de>,
+        {
+            // Convert each element as it is read rather than collecting all raw values first.
+            // Elements are captured as raw JSON spans, so unsupported ones are skipped
+            // without ever building a serde_json::Value tree for them.
+            let mut out = Vec::with_capacity(seq.size_hint().unwrap_or(0));
+            while let Some(raw) = seq.next_element::<Box<RawValue>>()? {
+                match serde_json::from_str::<Message>(raw.get()) {
+                    Ok(m) => out.push(m),
+                    Err(e) => {
+                        // Do not fail the whole event when a single element is unsupported.
+                        warn!("Skipping unsupported message element: {}", e);
+                    }
+                }
             }
+            Ok(out)
         }
     }
-    Ok(out)
+
+    deserializer.deserialize_seq(LenientMessageVec)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_message_event_from_raw_group() {
+        let raw: RawMessageEvent = serde_json::from_str(
+            r#"{
+                "message_id": 7,
+                "message_type": "group",
+                "sender": {"user_id": 42, "nickname": "alice"},
+                "message": [{"type": "text", "data": {"text": "hi"}}],
+                "group_id": 1001,
+                "group_name": "test group"
+            }"#,
+        )
+        .unwrap();
+
+        let event = MessageEvent::from(raw);
+        assert_eq!(event.message_id, 7);
+        assert!(event.is_group_message);
+        assert_eq!(event.sender.user_id, 42);
+        assert_eq!(event.message_list.len(), 1);
+        assert_eq!(event.group_id, Some(1001));
+        assert_eq!(event.group_name.as_deref(), Some("test group"));
+    }
+
+    #[test]
+    fn test_message_type_raw_round_trip() {
+        for mt in [MessageType::Private, MessageType::Group] {
+            assert_eq!(MessageType::from_raw(mt.as_str()), Some(mt));
+            assert_eq!(mt.to_string(), mt.as_str());
+            assert_eq!(serde_json::to_string(&mt).unwrap(), format!("\"{}\"", mt.as_str()));
+        }
+        assert_eq!(MessageType::from_raw("guild"), None);
+    }
+
+    #[test]
+    fn test_raw_message_event_skips_unsupported_elements() {
+        let raw: RawMessageEvent = serde_json::from_str(
+            r#"{
+                "message_id": 8,
+                "message_type": "private",
+                "sender": {"user_id": 42, "nickname": "alice"},
+                "message": [
+                    {"type": "text", "data": {"text": "look"}},
+                    {"type": "image", "data": {"file": "a.png"}},
+                    {"type": "at", "data": {"qq": 10001}}
+                ]
+            }"#,
+        )
+        .unwrap();
+
+        assert_eq!(raw.message.len(), 2);
+        assert_eq!(raw.message[0].to_string(), "look");
+        assert_eq!(raw.message[1].to_string(), "@10001");
+    }
+
+    #[test]
+    fn test_raw_message_event_from_value() {
+        let value = serde_json::json!({
+            "message_id": 9,
+            "message_type": "private",
+            "sender": {"user_id": 42, "nickname": "alice"},
+            "message": [{"type": "reply", "data": {"id": "5"}}]
+        });
+
+        let raw: RawMessageEvent = serde_json::from_value(value).unwrap();
+        assert_eq!(raw.message.len(), 1);
+        assert_eq!(raw.message[0].to_string(), "[Reply of message ID 5]");
+    }
 }
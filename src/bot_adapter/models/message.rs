@@ -2,41 +2,83 @@ use serde::{Deserialize, Serialize};
 use serde::de::{self, Deserializer};
 use std::fmt;
 
-fn deserialize_i64_from_string_or_number<'de, D>(deserializer: D) -> Result<i64, D::Error>
-where
-    D: Deserializer<'de>,
-{
-    let v = serde_json::Value::deserialize(deserializer)?;
-    match v {
-        serde_json::Value::Number(n) => n
-            .as_i64()
-            .ok_or_else(|| de::Error::custom("numeric value is not an i64")),
-        serde_json::Value::String(s) => s
-            .parse::<i64>()
-            .map_err(|e| de::Error::custom(format!("failed to parse i64 from string: {e}"))),
-        other => Err(de::Error::custom(format!(
-            "expected string or number for i64, got {other}" 
-        ))),
+// The helpers below visit the scalar directly instead of buffering it into a
+// serde_json::Value first, so decoding a segment field allocates nothing for numbers.
+
+struct I64FromStringOrNumber;
+
+impl<'de> de::Visitor<'de> for I64FromStringOrNumber {
+    type Value = i64;
+
+    fn expecting(&self, f: &mut fmt::Formatter) -> fmt::Result {
+        f.write_str("string or number for i64")
+    }
+
+    fn visit_i64<E: de::Error>(self, v: i64) -> Result<i64, E> {
+        Ok(v)
+    }
+
+    fn visit_u64<E: de::Error>(self, v: u64) -> Result<i64, E> {
+        i64::try_from(v).map_err(|_| E::custom("numeric value is not an i64"))
+    }
+
+    fn visit_f64<E: de::Error>(self, _v: f64) -> Result<i64, E> {
+        Err(E::custom("numeric value is not an i64"))
+    }
+
+    fn visit_str<E: de::Error>(self, s: &str) -> Result<i64, E> {
+        s.parse::<i64>()
+            .map_err(|e| E::custom(format!("failed to parse i64 from string: {e}")))
     }
 }
 
-fn deserialize_option_i64_from_string_or_number<'de, D>(deserializer: D) -> Result<Option<i64>, D::Error>
+fn deserialize_i64_from_string_or_number<'de, D>(deserializer: D) -> Result<i64, D::Error>
 where
     D: Deserializer<'de>,
 {
-    let opt = Option::<serde_json::Value>::deserialize(deserializer)?;
-    match opt {
-        None | Some(serde_json::Value::Null) => Ok(None),
-        Some(serde_json::Value::Number(n)) => Ok(n.as_i64()),
-        Some(serde_json::Value::String(s)) => {
-            let parsed = s
-                .parse::<i64>()
-                .map_err(|e| de::Error::custom(format!("failed to parse i64 from string: {e}")))?;
-            Ok(Some(parsed))
-        }
-        Some(other) => Err(de::Error::custom(format!(
-            "expected null/string/number for Option<i64>, got {other}"
-        ))),
+    deserializer.deserialize_any(I64FromStringOrNumber)
+}
+
+struct OptionStringFromStringOrNumber;
+
+impl<'de> de::Visitor<'de> for OptionStringFromStringOrNumber {
+    type Value = Option<String>;
+
+    fn expecting(&self, f: &mut fmt::Formatter) -> fmt::Result {
+        f.write_str("null/string/number for Option<String>")
+    }
+
+    fn visit_none<E: de::Error>(self) -> Result<Option<String>, E> {
+        Ok(None)
+    }
+
+    fn visit_unit<E: de::Error>(self) -> Result<Option<String>, E> {
+        Ok(None)
+    }
+
+    fn visit_some<D: Deserializer<'de>>(self, deserializer: D) -> Result<Option<String>, D::Error> {
+        deserializer.deserialize_any(self)
+    }
+
+    fn visit_i64<E: de::Error>(self, v: i64) -> Result<Option<String>, E> {
+        Ok(Some(v.to_string()))
+    }
+
+    fn visit_u64<E: de::Error>(self, v: u64) -> Result<Option<String>, E> {
+        Ok(Some(v.to_string()))
+    }
+
+    fn visit_f64<E: de::Error>(self, v: f64) -> Result<Option<String>, E> {
+        // Format like serde_json::Number so output matches the JSON text (1.0, 1e20)
+        Ok(serde_json::Number::from_f64(v).map(|n| n.to_string()))
+    }
+
+    fn visit_str<E: de::Error>(self, s: &str) -> Result<Option<String>, E> {
+        Ok(Some(s.to_owned()))
+    }
+
+    fn visit_string<E: de::Error>(self, s: String) -> Result<Option<String>, E> {
+        Ok(Some(s))
     }
 }
 
@@ -46,15 +88,7 @@ fn deserialize_option_string_from_string_or_number<'de, D>(
 where
     D: Deserializer<'de>,
 {
-    let opt = Option::<serde_json::Value>::deserialize(deserializer)?;
-    match opt {
-        None | Some(serde_json::Value::Null) => Ok(None),
-        Some(serde_json::Value::String(s)) => Ok(Some(s)),
-        Some(serde_json::Value::Number(n)) => Ok(Some(n.to_string())),
-        Some(other) => Err(de::Error::custom(format!(
-            "expected null/string/number for Option<String>, got {other}"
-        ))),
-    }
+    deserializer.deserialize_option(OptionStringFromStringOrNumber)
 }
 
 /// Base trait for all message types
@@ -77,9 +111,9 @@ pub enum Message {
 impl fmt::Display for Message {
     fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
         match self {
-            Message::PlainText(msg) => write!(f, "{}", msg),
-            Message::At(msg) => write!(f, "{}", msg),
-            Message::Reply(msg) => write!(f, "{}", msg),
+            Message::PlainText(msg) => fmt::Display::fmt(msg, f),
+            Message::At(msg) => fmt::Display::fmt(msg, f),
+            Message::Reply(msg) => fmt::Display::fmt(msg, f),
         }
     }
 }
@@ -268,6 +302,50 @@ mod tests {
         assert!(!prop.is_at_me);
     }
 
+    #[test]
+    fn test_message_dispatch_by_type_tag() {
+        let text: Message = serde_json::from_str(r#"{"type":"text","data":{"text":"hello"}}"#).unwrap();
+        assert_eq!(text.get_type(), "text");
+        assert_eq!(text.to_string(), "hello");
+
+        let at: Message = serde_json::from_str(r#"{"type":"at","data":{"target":"42"}}"#).unwrap();
+        assert_eq!(at.get_type(), "at");
+        assert_eq!(at.to_string(), "@42");
+
+        let reply: Message = serde_json::from_str(r#"{"type":"replay","data":{"id":1}}"#).unwrap();
+        assert_eq!(reply.get_type(), "reply");
+        assert_eq!(reply.to_string(), "[Reply of message ID 1]");
+
+        assert!(serde_json::from_str::<Message>(r#"{"type":"image","data":{}}"#).is_err());
+    }
+
+    #[test]
+    fn test_deserialize_segments_from_string_or_number() {
+        let at: Message = serde_json::from_str(r#"{"type":"at","data":{"qq":12345}}"#).unwrap();
+        assert!(matches!(at, Message::At(AtTargetMessage { target: Some(ref t) }) if t == "12345"));
+
+        let at: Message = serde_json::from_str(r#"{"type":"at","data":{"qq":"all"}}"#).unwrap();
+        assert!(matches!(at, Message::At(AtTargetMessage { target: Some(ref t) }) if t == "all"));
+
+        let at: Message = serde_json::from_str(r#"{"type":"at","data":{"qq":1.0}}"#).unwrap();
+        assert!(matches!(at, Message::At(AtTargetMessage { target: Some(ref t) }) if t == "1.0"));
+
+        let at: Message = serde_json::from_str(r#"{"type":"at","data":{"qq":1e20}}"#).unwrap();
+        assert!(matches!(at, Message::At(AtTargetMessage { target: Some(ref t) }) if t == "1e20"));
+
+        let at: Message = serde_json::from_str(r#"{"type":"at","data":{"qq":null}}"#).unwrap();
+        assert!(matches!(at, Message::At(AtTargetMessage { target: None })));
+
+        let reply: Message = serde_json::from_str(r#"{"type":"reply","data":{"id":"-99"}}"#).unwrap();
+        assert!(matches!(reply, Message::Reply(ReplyMessage { id: -99, .. })));
+
+        let reply: Message = serde_json::from_str(r#"{"type":"reply","data":{"id":99}}"#).unwrap();
+        assert!(matches!(reply, Message::Reply(ReplyMessage { id: 99, .. })));
+
+        assert!(serde_json::from_str::<Message>(r#"{"type":"reply","data":{"id":"abc"}}"#).is_err());
+        assert!(serde_json::from_str::<Message>(r#"{"type":"reply","data":{"id":1.5}}"#).is_err());
+    }
+
     #[test]
     fn test_message_prop_dedup_at_targets() {
         let msgs = vec![
@@ -7,7 +7,7 @@ use log::{error, info};
 use std::collections::HashMap;
 use std::sync::Arc;
 use tokio::sync::{mpsc, oneshot};
-use tokio::task::block_in_place;
+use tokio::task::{block_in_place, JoinHandle};
 use tokio::sync::Mutex as TokioMutex;
 use tokio::select;
 
@@ -17,6 +17,8 @@ pub struct BotAdapterNode {
     event_rx: Option<TokioMutex<mpsc::UnboundedReceiver<MessageEvent>>>,
     error_rx: Option<TokioMutex<mpsc::UnboundedReceiver<String>>>,
     adapter_handle: Option<SharedBotAdapter>,
+    /// BotAdapter::start keeps reconnecting until aborted, so the task is kept for cleanup
+    adapter_task: Option<JoinHandle<()>>,
     runtime: Option<tokio::runtime::Runtime>,
 }
 
@@ -28,6 +30,7 @@ impl BotAdapterNode {
             event_rx: None,
             error_rx: None,
             adapter_handle: None,
+            adapter_task: None,
             runtime: None,
         }
     }
@@ -133,11 +136,11 @@ impl Node for BotAdapterNode {
         };
 
         let adapter_handle = if let Ok(handle) = tokio::runtime::Handle::try_current() {
-            handle.spawn(run_adapter);
+            self.adapter_task = Some(handle.spawn(run_adapter));
             block_in_place(|| handle.block_on(async { adapter_rx.await.ok() }))
         } else {
             let runtime = tokio::runtime::Runtime::new()?;
-            runtime.spawn(run_adapter);
+            self.adapter_task = Some(runtime.spawn(run_adapter));
             let adapter = runtime.block_on(async { adapter_rx.await.ok() });
             self.runtime = Some(runtime);
             adapter
@@ -188,7 +191,11 @@ impl Node for BotAdapterNode {
                 })
             })
         } else {
-            let runtime = tokio::runtime::Runtime::new()?;
+            // Reuse the runtime created in on_start; building a fresh multi-thread
+            // runtime here would spawn a new worker pool for every received event.
+            let runtime = self.runtime.as_ref().ok_or_else(|| {
+                crate::error::Error::ValidationError("Bot adapter runtime is not initialized".to_string())
+            })?;
             runtime.block_on(async {
                 if let Some(error_rx) = error_rx {
                     select! {
@@ -229,6 +236,9 @@ impl Node for BotAdapterNode {
     }
 
     fn on_cleanup(&mut self) -> Result<()> {
+        if let Some(task) = self.adapter_task.take() {
+            task.abort();
+        }
         self.event_rx = None;
         self.error_rx = None;
         self.adapter_handle = None;
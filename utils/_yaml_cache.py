@@ -0,0 +1,32 @@
+import functools
+import os
+from typing import Any, Dict, Optional
+
+import yaml
+
+try:
+    # libyaml-backed loader, several times faster than the pure-Python one
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader  # type: ignore[assignment]
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_CONFIG_PATH = os.path.join(PROJECT_ROOT, "config.yaml")
+
+
+@functools.lru_cache(maxsize=None)
+def _load(abs_path: str) -> Dict[str, Any]:
+    if not os.path.exists(abs_path):
+        return {}
+    with open(abs_path, "r", encoding="utf-8") as f:
+        loaded: Any = yaml.load(f, Loader=_SafeLoader)
+    return loaded if isinstance(loaded, dict) else {}
+
+
+def load_config_yaml(path: Optional[str] = None) -> Dict[str, Any]:
+    """Return the parsed config.yaml as a dict ({} if missing or not a mapping).
+
+    Each file is parsed once per process and the same dict is shared by every
+    caller, so treat the result as read-only.
+    """
+    return _load(os.path.abspath(path or DEFAULT_CONFIG_PATH))
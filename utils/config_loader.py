@@ -1,8 +1,8 @@
 import os
-import yaml
 from typing import Optional
 
 from pydantic import BaseModel, Field
+from utils._yaml_cache import load_config_yaml
 from utils.logging_config import logger
 
 
@@ -46,10 +46,9 @@ class ConfigLoader:
             self.config = Config()
             return
         
-        with open(config_path) as file:
-            logger.info(f"Loading config from {config_path}")
-            yaml_data = yaml.safe_load(file) or {}
-            self.config = Config(**yaml_data)
+        logger.info(f"Loading config from {config_path}")
+        yaml_data = load_config_yaml(config_path)
+        self.config = Config(**yaml_data)
     
     def __getattr__(self, name: str):
         """Allow accessing config attributes directly from loader."""
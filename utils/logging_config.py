@@ -10,16 +10,11 @@ def _discover_log_level() -> int:
     if not level_str:
         # Try config.yaml
         try:
-            import yaml
-            project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-            cfg_path = os.path.join(project_root, "config.yaml")
-            if os.path.exists(cfg_path):
-                with open(cfg_path, "r", encoding="utf-8") as f:
-                    loaded = yaml.safe_load(f)
-                    if isinstance(loaded, dict):
-                        raw = loaded.get("log_level")
-                        if isinstance(raw, str) and raw.strip():
-                            level_str = raw.strip()
+            from utils._yaml_cache import load_config_yaml
+
+            raw = load_config_yaml().get("log_level")
+            if isinstance(raw, str) and raw.strip():
+                level_str = raw.strip()
         except Exception:
             pass
     if not level_str:
@@ -59,20 +54,15 @@ def _discover_log_dir() -> str:
 
     # 2) Try read config.yaml next to project root
     try:
-        from typing import Any
         from typing import Optional as _Optional
 
-        import yaml  # local import to avoid hard dependency at import time if unused
-
-        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-        cfg_path = os.path.join(project_root, "config.yaml")
-        if os.path.exists(cfg_path):
-            with open(cfg_path, "r", encoding="utf-8") as f:
-                loaded: Any = yaml.safe_load(f)
-                if isinstance(loaded, dict):
-                    raw: _Optional[str] = loaded.get("loger_path") or loaded.get("logger_path")  # type: ignore[reportUnknownMemberType]
-                    if isinstance(raw, str) and raw.strip():
-                        return raw
+        # local import to avoid hard dependency at import time if unused
+        from utils._yaml_cache import load_config_yaml
+
+        loaded = load_config_yaml()
+        raw: _Optional[str] = loaded.get("loger_path") or loaded.get("logger_path")
+        if isinstance(raw, str) and raw.strip():
+            return raw
     except Exception:
         # Swallow and fallback
         pass
@@ -119,6 +109,14 @@ console_handler.setLevel(log_level)
 
 formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
+# The format above never prints caller, thread or process info, so skip
+# collecting it for every record (see "Optimization" in the logging HOWTO)
+logging._srcfile = None  # type: ignore[attr-defined]
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+logging.logAsyncioTasks = False  # Python 3.12+, harmless on older versions
+
 # Avoid attaching duplicate handlers if re-imported
 existing_types = {type(h) for h in logger.handlers}
 if file_handler and TimedRotatingFileHandler not in existing_types: